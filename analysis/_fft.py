@@ -0,0 +1,24 @@
+"""
+scipy.fft backend setup shared by the analysis scripts.
+
+Importing this registers pyFFTW as the global scipy.fft backend (threaded,
+FFTW_MEASURE planning, interface plan cache) when pyFFTW is installed, so
+psd, oaconvolve/fftconvolve correlators etc. all reuse the same plans.
+Without pyFFTW scipy's own pocketfft is used.
+"""
+import os
+
+import scipy.fft
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft
+except ImportError:
+    HAVE_PYFFTW = False
+else:
+    HAVE_PYFFTW = True
+    pyfftw.config.NUM_THREADS = os.cpu_count() or 1
+    pyfftw.config.PLANNER_EFFORT = "FFTW_MEASURE"
+    pyfftw.interfaces.cache.enable()
+    # not only=True: anything pyFFTW can't do still falls back to pocketfft
+    scipy.fft.set_global_backend(pyfftw.interfaces.scipy_fft)
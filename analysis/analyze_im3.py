@@ -5,7 +5,9 @@ from pathlib import Path
 
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.signal import find_peaks
 
+import _fft  # noqa: F401  (pyFFTW scipy.fft backend, if installed)
 from rf_io import read_rtlsdr_u8iq, read_hackrf_i8iq
 from psd import psd_db_avg
 from im3 import im3_metrics
@@ -15,6 +17,7 @@ def peak_candidates(f_hz, p_db, f_min, f_max, k=6, min_sep_hz=5_000,
                     exclude_center_hz=None, exclude_halfwidth_hz=0.0):
     """
     Returns up to k candidate peaks (freq_hz, power_db) in [f_min, f_max],
+    taken from the local maxima (find_peaks) of the window,
     enforces min_sep_hz separation between the chosen peaks.
     excludes anything within +-exclude_halfwidth_hz of exclude_center_hz.
     """
@@ -25,8 +28,13 @@ def peak_candidates(f_hz, p_db, f_min, f_max, k=6, min_sep_hz=5_000,
     if idx.size == 0:
         return []
 
-    # sort by descending power
-    idx_sorted = idx[np.argsort(p_db[idx])[::-1]]
+    # only local maxima are candidates; sort that (small) set by descending power
+    p_win = p_db[idx]
+    df = abs(float(f_hz[1] - f_hz[0])) if len(f_hz) > 1 else 1.0
+    peaks, _ = find_peaks(p_win, distance=max(1, int(min_sep_hz / df)))
+    if peaks.size == 0:
+        peaks = np.array([int(np.argmax(p_win))])
+    idx_sorted = idx[peaks[np.argsort(p_win[peaks])[::-1]]]
 
     chosen = []
     for i in idx_sorted:
@@ -45,40 +53,29 @@ def choose_tone_pair(c1, c2, expected_sep_hz, fc_hz, enforce_straddle_fc=True):
       2) max (p1+p2)
       3) min |center - fc|
     """
-    best = None
-    best_sep_err = 1e99
-    best_sum_p = -1e99
-    best_center_err = 1e99
-
-    for f1, p1 in c1:
-        for f2, p2 in c2:
-            if f2 <= f1:
-                continue
-            if enforce_straddle_fc and not (f1 < fc_hz < f2):
-                continue
-
-            sep = f2 - f1
-            sep_err = abs(sep - expected_sep_hz)
-            center = 0.5 * (f1 + f2)
-            center_err = abs(center - fc_hz)
-            sum_p = p1 + p2
-
-            # sep_err, then -sum_p, then center_err
-            better = False
-            if sep_err < best_sep_err - 1e-9:
-                better = True
-            elif abs(sep_err - best_sep_err) < 1e-9 and sum_p > best_sum_p + 1e-9:
-                better = True
-            elif abs(sep_err - best_sep_err) < 1e-9 and abs(sum_p - best_sum_p) < 1e-9 and center_err < best_center_err:
-                better = True
-
-            if better:
-                best = (f1, p1, f2, p2, sep, sep_err, center, center_err)
-                best_sep_err = sep_err
-                best_sum_p = sum_p
-                best_center_err = center_err
-
-    return best
+    if len(c1) == 0 or len(c2) == 0:
+        return None
+
+    f1, p1 = np.asarray(c1, dtype=np.float64).T
+    f2, p2 = np.asarray(c2, dtype=np.float64).T
+    F1, F2 = np.meshgrid(f1, f2, indexing="ij")
+    P1, P2 = np.meshgrid(p1, p2, indexing="ij")
+
+    valid = F2 > F1
+    if enforce_straddle_fc:
+        valid &= (F1 < fc_hz) & (fc_hz < F2)
+    if not np.any(valid):
+        return None
+
+    F1, F2, P1, P2 = F1[valid], F2[valid], P1[valid], P2[valid]
+    sep = F2 - F1
+    sep_err = np.abs(sep - expected_sep_hz)
+    center = 0.5 * (F1 + F2)
+    center_err = np.abs(center - fc_hz)
+
+    # sep_err, then -sum_p, then center_err (lexsort keys go last-to-first)
+    i = np.lexsort((center_err, -(P1 + P2), sep_err))[0]
+    return tuple(float(v[i]) for v in (F1, P1, F2, P2, sep, sep_err, center, center_err))
 
 
 def main():
@@ -1,10 +1,12 @@
 import numpy as np
 
 def peak_near(f, p_db, f0_hz, window_hz=30_000):
-    m = (f > f0_hz - window_hz) & (f < f0_hz + window_hz)
-    if not np.any(m):
+    # f must be ascending (fftshifted axis): the open window is a slice
+    lo = np.searchsorted(f, f0_hz - window_hz, side="right")
+    hi = np.searchsorted(f, f0_hz + window_hz, side="left")
+    if hi <= lo:
         return float("nan")
-    return float(np.max(p_db[m]))
+    return float(np.max(p_db[lo:hi]))
 
 def im3_metrics(f, p_db, f1, f2, window_hz=30_000):
     fim3_low = 2*f1 - f2
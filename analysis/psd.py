@@ -1,10 +1,22 @@
+from functools import lru_cache
+
 import numpy as np
+import scipy.fft as sfft
+
+import _fft  # noqa: F401  (pyFFTW scipy.fft backend, if installed)
+
+@lru_cache(maxsize=8)
+def _hann(n: int) -> np.ndarray:
+    """Cached float32 Hann window (read-only, shared between calls)."""
+    w = np.hanning(n).astype(np.float32)
+    w.flags.writeable = False
+    return w
 
 def psd_db(x: np.ndarray, fs: float, fc: float, nfft: int = 262144):
     """Return freq axis (Hz) and PSD-like magnitude in dB (relative)."""
     x = x[:nfft]
-    w = np.hanning(len(x))
-    X = np.fft.fftshift(np.fft.fft(x * w))
+    w = _hann(len(x))
+    X = np.fft.fftshift(sfft.fft(x * w, workers=-1, overwrite_x=True))
     p = 20*np.log10(np.abs(X) + 1e-12)
     f = fc + np.fft.fftshift(np.fft.fftfreq(len(x), d=1/fs))
     return f, p
@@ -25,8 +37,9 @@ def psd_db_avg(x: np.ndarray, fs: float, fc: float, nfft: int = 262144, navg: in
 
     frames = x.reshape(navg, nfft)
 
-    w = np.hanning(nfft).astype(np.float32)
-    X = np.fft.fft(frames * w, axis=1)
+    w = _hann(nfft)
+    # frames*w is a fresh temporary, so the FFT can work in place
+    X = sfft.fft(frames * w, axis=1, workers=-1, overwrite_x=True)
     P = np.mean(np.abs(X)**2, axis=0) + 1e-30
 
     f = fc + np.fft.fftfreq(nfft, d=1/fs)
@@ -2,8 +2,9 @@ import argparse
 import json
 from pathlib import Path
 import numpy as np
-from scipy.signal import lfilter
+from scipy.signal import oaconvolve
 
+import _fft  # noqa: F401  (pyFFTW scipy.fft backend, if installed)
 from rf_io import read_rtlsdr_u8iq
 from qpsk_lib import (
     parse_meta, generate_reference, mix_down,
@@ -40,8 +41,9 @@ def main():
     if args.coarse == "qpsk4":
         cfo_coarse = coarse_cfo_qpsk4(rx_search, fs=args.fs)
 
-    rx_search_c = mix_down(rx_search, fs=args.fs, f_hz=cfo_coarse)
+    # rx_search is a prefix of rx, so mix the full capture once and slice
     rx_c = mix_down(rx, fs=args.fs, f_hz=cfo_coarse)
+    rx_search_c = rx_c[:search_len]
 
     # Burst detect by correlation with known sample-rate reference
     k0, corr = correlate_find_peak(rx_search_c, tx_ref)
@@ -64,7 +66,8 @@ def main():
     evm_samp_pct = float(100.0 * evm_samp)
 
     # Matched filter (RRC)
-    y = lfilter(h, [1.0], rx_eq)
+    # FIR, so truncated full convolution == lfilter(h, [1.0], rx_eq)
+    y = oaconvolve(rx_eq, h, mode="full")[:len(rx_eq)]
 
     sps = params["sps"]
     g = (len(h) - 1) // 2
@@ -73,34 +76,25 @@ def main():
     n_pre = len(pre_syms)
     n_pay = params["payload_syms"]
 
-    # Search symbol timing phase (0..sps-1) using preamble EVM
-    best = dict(evm=1e9, tau=0, g2=1+0j, sym_rx=None)
-    for tau in range(sps):
-        idxs = tau + 2*g + np.arange(n_syms) * sps
-        idxs = idxs[idxs < len(y)]
-        sym_rx = y[idxs]
-        if len(sym_rx) < guard_syms + n_pre + 10:
-            continue
-
-        pre_start = guard_syms
-        pre_stop = guard_syms + n_pre
-        sym_tx_pre = sym_stream[pre_start:pre_stop]
-        sym_rx_pre = sym_rx[pre_start:pre_stop]
-
-        g2 = np.vdot(sym_tx_pre, sym_rx_pre) / np.vdot(sym_tx_pre, sym_tx_pre)
-        sym_rx_al = sym_rx_pre / (g2 + 1e-12)
-
-        evm_pre = np.sqrt(np.mean(np.abs(sym_rx_al - sym_tx_pre)**2) / np.mean(np.abs(sym_tx_pre)**2))
-
-        if evm_pre < best["evm"]:
-            best = dict(evm=float(evm_pre), tau=tau, g2=complex(g2), sym_rx=sym_rx)
-
-    if best["sym_rx"] is None:
+    # Search symbol timing phase (0..sps-1) using preamble EVM.
+    # Column tau of Y holds the symbol-spaced samples y[tau + 2g + k*sps],
+    # so every timing phase is scored in one batched pass.
+    base = 2*g
+    n_avail = max(0, (len(y) - base) // sps)
+    if n_avail < guard_syms + n_pre + 10:
         raise RuntimeError("Symbol timing search failed. Try higher TX power or less attenuation, and ensure fs matches.")
+    Y = y[base:base + n_avail*sps].reshape(n_avail, sps)
+
+    sym_tx_pre = sym_stream[guard_syms:guard_syms + n_pre]
+    pre = Y[guard_syms:guard_syms + n_pre, :]                      # (n_pre, sps)
+    g2_arr = (np.conj(sym_tx_pre)[:, None] * pre).sum(axis=0) / np.vdot(sym_tx_pre, sym_tx_pre)
+    resid = pre / (g2_arr + 1e-12) - sym_tx_pre[:, None]
+    evm_arr = np.sqrt(np.mean(np.abs(resid)**2, axis=0) / np.mean(np.abs(sym_tx_pre)**2))
 
-    sym_rx = best["sym_rx"]
-    tau_best = best["tau"]
-    g2_best = best["g2"]
+    tau_best = int(np.argmin(evm_arr))
+    g2_best = complex(g2_arr[tau_best])
+    sym_rx = Y[:, tau_best]
+    evm_pre_best = float(evm_arr[tau_best])
 
     # Use preamble+payload region
     start = guard_syms
@@ -134,7 +128,7 @@ def main():
         "h_hat_mag": float(np.abs(h_hat)),
         "h_hat_phase_deg": float(np.angle(h_hat, deg=True)),
         "timing_tau_samples": int(tau_best),
-        "evm_preamble_pct": float(100.0 * best["evm"]),
+        "evm_preamble_pct": float(100.0 * evm_pre_best),
         "evm_sample_pct": float(evm_samp_pct),
         "evm_symbol_pct": float(evm_sym_pct),
         "payload_ber": float(ber),
@@ -1,6 +1,11 @@
+import hashlib
+import json
 import re
+from pathlib import Path
+
 import numpy as np
-from scipy.signal import lfilter, fftconvolve
+import scipy.fft as sfft
+from scipy.signal import oaconvolve
 
 
 def rrc_taps(beta: float, sps: int, span_syms: int) -> np.ndarray:
@@ -12,22 +17,23 @@ def rrc_taps(beta: float, sps: int, span_syms: int) -> np.ndarray:
     """
     N = span_syms * sps
     t = np.arange(-N / 2, N / 2 + 1) / sps
-    taps = np.zeros_like(t, dtype=np.float64)
-
-    for i, ti in enumerate(t):
-        if abs(ti) < 1e-12:
-            taps[i] = 1.0 - beta + (4 * beta / np.pi)
-        elif beta > 0 and abs(abs(ti) - 1 / (4 * beta)) < 1e-12:
-            taps[i] = (beta / np.sqrt(2)) * (
-                (1 + 2 / np.pi) * np.sin(np.pi / (4 * beta))
-                + (1 - 2 / np.pi) * np.cos(np.pi / (4 * beta))
-            )
-        else:
-            num = np.sin(np.pi * ti * (1 - beta)) + 4 * beta * ti * np.cos(
-                np.pi * ti * (1 + beta)
-            )
-            den = np.pi * ti * (1 - (4 * beta * ti) ** 2)
-            taps[i] = num / den
+
+    # the two removable singularities get their closed-form limits below
+    center = np.abs(t) < 1e-12
+    edge = np.zeros_like(center)
+    if beta > 0:
+        edge = ~center & (np.abs(np.abs(t) - 1 / (4 * beta)) < 1e-12)
+
+    num = np.sin(np.pi * t * (1 - beta)) + 4 * beta * t * np.cos(np.pi * t * (1 + beta))
+    den = np.pi * t * (1 - (4 * beta * t) ** 2)
+    taps = num / np.where(center | edge, 1.0, den)
+
+    taps[center] = 1.0 - beta + (4 * beta / np.pi)
+    if beta > 0:
+        taps[edge] = (beta / np.sqrt(2)) * (
+            (1 + 2 / np.pi) * np.sin(np.pi / (4 * beta))
+            + (1 - 2 / np.pi) * np.cos(np.pi / (4 * beta))
+        )
 
     taps /= np.sqrt(np.sum(taps**2))
     return taps.astype(np.float32)
@@ -52,11 +58,10 @@ def bits_to_qpsk(bits: np.ndarray) -> np.ndarray:
 
 def qpsk_to_bits(syms: np.ndarray) -> np.ndarray:
     # Hard decision demapper, works w/ bits_to_qpsk()
-    b0 = (np.imag(syms) < 0).astype(np.int8)
-    b1 = (np.real(syms) < 0).astype(np.int8)
-    bits = np.empty(2 * len(syms), dtype=np.int8) 
-    bits[0::2] = b0
-    bits[1::2] = b1
+    # demaps along the last axis, so (S, N) symbols give (S, 2N) bits
+    bits = np.empty(syms.shape[:-1] + (2 * syms.shape[-1],), dtype=np.int8)
+    np.less(np.imag(syms), 0, out=bits[..., 0::2], casting="unsafe")
+    np.less(np.real(syms), 0, out=bits[..., 1::2], casting="unsafe")
     return bits
 
 
@@ -109,7 +114,13 @@ def parse_meta(meta_path: str | None) -> dict:
     return params
 
 
-def generate_reference(params: dict):
+# Bump when generate_reference output changes so stale cache files are ignored
+_REF_CACHE_VERSION = 2
+_REF_KEYS = ("fs", "sym_rate", "sps", "beta", "span_syms", "guard_syms", "payload_syms", "seed", "amp")
+_REF_FIELDS = ("tx_ref", "sym_stream", "pre_syms", "payload_bits", "h")
+
+
+def generate_reference(params: dict, cache_dir: str | None = "results/cache"):
     """
     Regenerate:
       - tx_ref: sample-rate shaped, int8-quantized reference waveform (complex64)
@@ -118,7 +129,30 @@ def generate_reference(params: dict):
       - payload_bits: payload bits (int8)
       - h: RRC taps (float32)
     This matches generator logic (seed=1234).
+    Results are memoized to cache_dir/ref_<key>.npz keyed by the waveform
+    params (cache_dir=None disables the cache).
     """
+    if cache_dir is None:
+        return _generate_reference(params)
+
+    key_params = {k: params.get(k) for k in _REF_KEYS}
+    key_params["seed"] = params.get("seed", 1234)
+    key_params["amp"] = params.get("amp", 0.25)
+    key_params["version"] = _REF_CACHE_VERSION
+    key = hashlib.sha1(json.dumps(key_params, sort_keys=True).encode()).hexdigest()[:16]
+    cache = Path(cache_dir) / f"ref_{key}.npz"
+
+    if cache.exists():
+        with np.load(cache) as d:
+            return tuple(d[name] for name in _REF_FIELDS)
+
+    out = _generate_reference(params)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, **dict(zip(_REF_FIELDS, out)))
+    return out
+
+
+def _generate_reference(params: dict):
     fs = params["fs"]
     sym_rate = params["sym_rate"]
     sps = params["sps"]
@@ -149,7 +183,11 @@ def generate_reference(params: dict):
     up[::sps] = sym_stream
 
     h = rrc_taps(beta=beta, sps=sps, span_syms=span)
-    x = lfilter(h, [1.0], up)
+    # FIR only, so a truncated full convolution == lfilter(h, [1.0], up).
+    # h is real: filter I and Q separately with real (rfft-based) convolutions.
+    x = np.empty(len(up), dtype=np.complex64)
+    x.real = oaconvolve(up.real, h, mode="full")[: len(up)]
+    x.imag = oaconvolve(up.imag, h, mode="full")[: len(up)]
 
     # Match generator: scale then int8 quantize
     x = amp * x / (np.max(np.abs(x)) + 1e-12)
@@ -160,34 +198,89 @@ def generate_reference(params: dict):
     return tx_ref.astype(np.complex64), sym_stream, pre_syms, payload_bits, h
 
 
-def mix_down(x: np.ndarray, fs: float, f_hz: float) -> np.ndarray:
-    n = np.arange(len(x), dtype=np.float64)
-    return x * np.exp(-1j * 2 * np.pi * f_hz * n / fs)
-
-
-def coarse_cfo_qpsk4(rx: np.ndarray, fs: float) -> float:
+def mix_down(x: np.ndarray, fs: float, f_hz: float, block: int = 4096) -> np.ndarray:
+    """
+    Frequency shift by -f_hz: x[n] * exp(-j*2pi*f_hz*n/fs), as complex64.
+    The phasor is carried as (per-block start phasor) * (block-length table),
+    so only len(x)/block + block exp() calls are made and no full-length
+    phase array is built. Block starts are exact, so there is no drift.
+    """
+    n = len(x)
+    w = -2 * np.pi * f_hz / fs
+    n_blk = -(-n // block)
+    lut = np.exp(1j * w * np.arange(block)).astype(np.complex64)
+    starts = np.exp(1j * w * block * np.arange(n_blk)).astype(np.complex64)
+
+    out = np.empty(n, dtype=np.complex64)
+    n_full = (n // block) * block
+    body = out[:n_full].reshape(-1, block)
+    np.multiply(x[:n_full].reshape(-1, block), lut, out=body)
+    body *= starts[: n_full // block, None]
+    if n_full < n:
+        tail = out[n_full:]
+        np.multiply(x[n_full:], lut[: n - n_full], out=tail)
+        tail *= starts[-1]
+    return out
+
+
+def coarse_cfo_qpsk4(rx: np.ndarray, fs: float, block: int = 65536) -> float:
     """
     CFO estimate using 4th-power phase increment:
       CFO ≈ angle(mean(rx4[n]*conj(rx4[n-1]))) * fs/(2pi) / 4
     good when QPSK energy present 
+    Accumulated block-wise (one sample overlap) so rx**4 and the lag
+    product are never materialized for the whole capture.
     """
     if len(rx) < 1000:
         return 0.0
-    rx4 = rx**4
-    z = rx4[1:] * np.conj(rx4[:-1])
-    m = np.mean(z)
+    acc = 0j
+    for lo in range(0, len(rx) - 1, block):
+        seg4 = rx[lo:lo + block + 1] ** 4
+        acc += np.vdot(seg4[:-1], seg4[1:])  # sum(rx4[n] * conj(rx4[n-1]))
+    m = acc / (len(rx) - 1)
     if not np.isfinite(m):
         return 0.0
     ang = np.angle(m)
     return float((fs * ang) / (2 * np.pi) / 4.0)
 
 
-def correlate_find_peak(rx: np.ndarray, ref: np.ndarray) -> tuple[int, np.ndarray]:
+def correlate_find_peak(rx: np.ndarray, ref: np.ndarray, out: np.ndarray | None = None,
+                        block_samples: int = 1 << 20) -> tuple[int, np.ndarray]:
     """
     Return (k0, corr) where corr[k] = sum rx[k:k+L] * conj(ref)
-    Implemented via fftconvolve with reversed conj reference.
+    Implemented as overlap-save against one precomputed spectrum of the
+    reversed conj reference. Every FFT is the same (batch, nfft) shape, so the
+    scipy.fft / pyFFTW plan is built once and reused for all blocks and calls,
+    and only ~block_samples of rx are in flight at a time.
+    out: optional complex64 buffer (>= len(rx)-L+1) reused for corr across calls.
     """
-    corr = fftconvolve(rx, np.conj(ref[::-1]), mode="valid")
+    L = len(ref)
+    n_out = len(rx) - L + 1
+    if n_out <= 0:
+        raise ValueError(f"rx ({len(rx)} samples) is shorter than ref ({L} samples)")
+
+    nfft = sfft.next_fast_len(4 * L)
+    step = nfft - L + 1                   # valid outputs per block
+    H = sfft.fft(np.conj(ref[::-1]).astype(np.complex64), nfft)
+
+    if out is None:
+        corr = np.empty(n_out, dtype=np.complex64)
+    elif len(out) < n_out:
+        raise ValueError(f"out ({len(out)} samples) is shorter than len(rx)-len(ref)+1 ({n_out})")
+    else:
+        corr = out[:n_out]
+
+    n_blk = max(1, block_samples // nfft)  # blocks per FFT call
+    for lo in range(0, n_out, n_blk * step):
+        nb = min(n_blk, -(-(n_out - lo) // step))
+        seg = rx[lo:lo + (nb - 1) * step + nfft]
+        if len(seg) < (nb - 1) * step + nfft:
+            seg = np.pad(seg, (0, (nb - 1) * step + nfft - len(seg)))
+        frames = np.lib.stride_tricks.sliding_window_view(seg, nfft)[::step]
+        Y = sfft.ifft(sfft.fft(frames, axis=1) * H, axis=1, overwrite_x=True)
+        n = min(nb * step, n_out - lo)
+        corr[lo:lo + n] = Y[:, L - 1:].reshape(-1)[:n]
+
     k0 = int(np.argmax(np.abs(corr)))
     return k0, corr
 
@@ -201,17 +294,22 @@ def fine_cfo_and_channel(rx_seg: np.ndarray, ref: np.ndarray, fs: float, mask_fr
     mag = np.abs(ref)
     mask = mag > (mask_frac * np.max(mag))
 
-    z = rx_seg[mask] * np.conj(ref[mask])
+    # gather the masked samples once and reuse them below
+    idx = np.flatnonzero(mask)
+    ref_m = ref[idx]
+    z = rx_seg[idx] * np.conj(ref_m)
     phi = np.unwrap(np.angle(z))
-    n = np.nonzero(mask)[0].astype(np.float64)
+    n = idx.astype(np.float64)
     if len(n) < 10:
         return 0.0, 1.0 + 0j, rx_seg, mask
 
-    slope, _ = np.polyfit(n, phi, 1)
+    # closed-form LS slope of phi vs n (no Vandermonde / lstsq like polyfit)
+    dn = n - n.mean()
+    slope = np.dot(dn, phi) / np.dot(dn, dn)
     cfo_hz = float(slope * fs / (2 * np.pi))
 
     n_all = np.arange(len(rx_seg), dtype=np.float64)
     rx_cfo = rx_seg * np.exp(-1j * 2 * np.pi * cfo_hz * n_all / fs)
 
-    h_hat = np.vdot(ref[mask], rx_cfo[mask]) / np.vdot(ref[mask], ref[mask])
+    h_hat = np.vdot(ref_m, rx_cfo[idx]) / np.vdot(ref_m, ref_m)
     return cfo_hz, complex(h_hat), rx_cfo, mask
@@ -2,10 +2,13 @@ import argparse
 import json
 from pathlib import Path
 import numpy as np
-from scipy.signal import fftconvolve
+from scipy.signal import find_peaks
 
+import analysis._fft  # noqa: F401  (pyFFTW scipy.fft backend, if installed)
 from analysis.rf_io import read_rtlsdr_u8iq
-from analysis.qpsk_hw_rx import parse_meta, generate_reference, estimate_cfo_and_channel  
+from analysis.qpsk_lib import (
+    parse_meta, generate_reference, correlate_find_peak, fine_cfo_and_channel
+)
 
 def main():
     ap = argparse.ArgumentParser()
@@ -31,24 +34,14 @@ def main():
     L = min(len(rx), int(args.seconds * args.fs))
     rx = rx[:L]
 
-    corr = fftconvolve(rx, np.conj(tx_ref[::-1]), mode="valid")
+    _, corr = correlate_find_peak(rx, tx_ref)
     mag = np.abs(corr)
 
     thr = args.peak_thresh * np.max(mag)
     min_sep = int((args.min_sep_ms / 1000.0) * args.fs)
 
-    # Greedy peak picking
-    candidates = np.where(mag > thr)[0]
-    peaks = []
-    last = -10**18
-    for k in candidates:
-        if k - last >= min_sep:
-            # local max in a small window
-            w = mag[max(0, k-50):min(len(mag), k+51)]
-            kk = int(np.argmax(w) + max(0, k-50))
-            if len(peaks) == 0 or kk - peaks[-1] >= min_sep:
-                peaks.append(kk)
-                last = kk
+    # Burst peaks: local maxima above thr, at least min_sep apart
+    peaks, _ = find_peaks(mag, height=thr, distance=max(1, min_sep))
 
     phases = []
     mags = []
@@ -58,7 +51,7 @@ def main():
         rx_seg = rx[k0:k0+len(tx_ref)]
         if len(rx_seg) < len(tx_ref):
             continue
-        cfo_hz, h_hat, _, _ = estimate_cfo_and_channel(rx_seg, tx_ref, fs=args.fs, mask_frac=args.mask_frac)
+        cfo_hz, h_hat, _, _ = fine_cfo_and_channel(rx_seg, tx_ref, fs=args.fs, mask_frac=args.mask_frac)
         phases.append(float(np.angle(h_hat)))
         mags.append(float(np.abs(h_hat)))
         cfos.append(float(cfo_hz))
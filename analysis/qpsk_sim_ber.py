@@ -10,20 +10,20 @@ def main():
     snr_db_list = np.arange(0, 13, 1)   # 0..12 dB
     n_bits = 400_000
 
-    ber_list = []
-    for snr_db in snr_db_list:
-        bits = rng.integers(0, 2, size=n_bits, dtype=np.int8)
-        syms = bits_to_qpsk(bits)
-
-        snr_lin = 10 ** (snr_db / 10.0)   # Es/N0
-        N0 = 1.0 / snr_lin
-        sigma = np.sqrt(N0 / 2.0)
-        noise = sigma * (rng.standard_normal(len(syms)) + 1j * rng.standard_normal(len(syms)))
-
-        r = syms + noise
-        bits_hat = qpsk_to_bits(r)
-        ber = float(np.mean(bits_hat != bits))
-        ber_list.append(ber)
+    # one bit stream, one (n_snr, n_syms) noise tensor, one batched demap
+    bits = rng.integers(0, 2, size=n_bits, dtype=np.int8)
+    syms = bits_to_qpsk(bits)
+
+    snr_lin = 10 ** (snr_db_list / 10.0)   # Es/N0
+    N0 = 1.0 / snr_lin
+    sigma = np.sqrt(N0 / 2.0)[:, None]
+    shape = (len(snr_db_list), len(syms))
+    noise = sigma * (rng.standard_normal(shape) + 1j * rng.standard_normal(shape))
+
+    r = syms[None, :] + noise
+    bits_hat = qpsk_to_bits(r)
+    ber_list = [float(b) for b in np.mean(bits_hat != bits[None, :], axis=1)]
+    for snr_db, ber in zip(snr_db_list, ber_list):
         print(f"SNR={snr_db:2d} dB  BER={ber:.3e}")
 
     Path("plots").mkdir(exist_ok=True)
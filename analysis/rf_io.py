@@ -1,26 +1,27 @@
 import numpy as np
 
-def read_rtlsdr_u8iq(filename: str) -> np.ndarray:
-    """Read rtl_sdr raw IQ file: interleaved uint8 I,Q (0..255). """
-    raw = np.fromfile(filename, dtype=np.uint8)
+def _iq_pairs(filename: str, dtype) -> np.ndarray:
+    """Load interleaved I,Q samples as an (N, 2) array (drops a trailing odd byte)."""
+    raw = np.fromfile(filename, dtype=dtype)
     if raw.size % 2 != 0:
         raw = raw[:-1]
-    i = raw[0::2].astype(np.float32)
-    q = raw[1::2].astype(np.float32)
+    return raw.reshape(-1, 2)
+
+def read_rtlsdr_u8iq(filename: str) -> np.ndarray:
+    """Read rtl_sdr raw IQ file: interleaved uint8 I,Q (0..255). """
+    raw = _iq_pairs(filename, np.uint8)
+    out = np.empty(len(raw), dtype=np.complex64)
+    # Write straight into the (re, im) float32 pairs of the output
+    view = out.view(np.float32).reshape(-1, 2)
     # Center around 0 and scale to ~[-1,1]
-    i = (i - 127.5) / 128.0
-    q = (q - 127.5) / 128.0
-    return i + 1j*q
+    np.subtract(raw, np.float32(127.5), out=view)
+    view *= np.float32(1.0 / 128.0)
+    return out
 
 def read_hackrf_i8iq(filename: str) -> np.ndarray:
     """Read HackRF raw IQ file: interleaved int8 I,Q. """
-    raw = np.fromfile(filename, dtype=np.int8).astype(np.float32)
-    if raw.size % 2 != 0:
-        raw = raw[:-1]
-    i = raw[0::2] / 128.0
-    q = raw[1::2] / 128.0
-    return i + 1j*q
-
-
-
-
+    raw = _iq_pairs(filename, np.int8)
+    out = np.empty(len(raw), dtype=np.complex64)
+    view = out.view(np.float32).reshape(-1, 2)
+    np.multiply(raw, np.float32(1.0 / 128.0), out=view)
+    return out
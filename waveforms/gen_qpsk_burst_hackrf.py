@@ -1,6 +1,6 @@
 import numpy as np
 from pathlib import Path
-from scipy.signal import lfilter
+from scipy.signal import oaconvolve, upfirdn
 
 def rrc_taps(beta: float, sps: int, span: int):
     """
@@ -11,26 +11,32 @@ def rrc_taps(beta: float, sps: int, span: int):
     """
     N = span * sps
     t = np.arange(-N/2, N/2 + 1) / sps  # in symbol periods
-    taps = np.zeros_like(t, dtype=np.float64)
-
-    for i, ti in enumerate(t):
-        if abs(ti) < 1e-12:
-            taps[i] = 1.0 - beta + (4 * beta / np.pi)
-        elif abs(abs(ti) - 1/(4*beta)) < 1e-12:
-            # special-case singularity at t = +-T/(4β)
-            taps[i] = (beta / np.sqrt(2)) * (
-                (1 + 2/np.pi) * np.sin(np.pi/(4*beta)) +
-                (1 - 2/np.pi) * np.cos(np.pi/(4*beta))
-            )
-        else:
-            num = np.sin(np.pi * ti * (1 - beta)) + 4 * beta * ti * np.cos(np.pi * ti * (1 + beta))
-            den = np.pi * ti * (1 - (4 * beta * ti)**2)
-            taps[i] = num / den
+
+    # t = 0 and t = +-T/(4β) are removable singularities: keep them out of
+    # the division and fill in their closed-form limits afterwards
+    center = np.abs(t) < 1e-12
+    edge = np.zeros_like(center)
+    if beta > 0:
+        edge = ~center & (np.abs(np.abs(t) - 1/(4*beta)) < 1e-12)
+
+    num = np.sin(np.pi * t * (1 - beta)) + 4 * beta * t * np.cos(np.pi * t * (1 + beta))
+    den = np.pi * t * (1 - (4 * beta * t)**2)
+    taps = num / np.where(center | edge, 1.0, den)
+
+    taps[center] = 1.0 - beta + (4 * beta / np.pi)
+    if beta > 0:
+        taps[edge] = (beta / np.sqrt(2)) * (
+            (1 + 2/np.pi) * np.sin(np.pi/(4*beta)) +
+            (1 - 2/np.pi) * np.cos(np.pi/(4*beta))
+        )
 
     # Normalize energy
     taps /= np.sqrt(np.sum(taps**2))
     return taps
 
+# Gray-coded QPSK constellation indexed by (b0 << 1) | b1
+QPSK_LUT = (np.array([+1+1j, -1+1j, +1-1j, -1-1j]) / np.sqrt(2)).astype(np.complex64)
+
 def bits_to_qpsk(bits: np.ndarray):
     """
     Gray-coded QPSK mapping:
@@ -40,18 +46,63 @@ def bits_to_qpsk(bits: np.ndarray):
       10 -> +1 - j
     """
     bits = bits.reshape(-1, 2)
-    b0 = bits[:, 0]
-    b1 = bits[:, 1]
-
-    i = np.where((b0 == 0) & (b1 == 0),  +1,
-        np.where((b0 == 0) & (b1 == 1),  -1,
-        np.where((b0 == 1) & (b1 == 1),  -1,  +1)))
-    q = np.where((b0 == 0) & (b1 == 0),  +1,
-        np.where((b0 == 0) & (b1 == 1),  +1,
-        np.where((b0 == 1) & (b1 == 1),  -1,  -1)))
-    return (i + 1j*q) / np.sqrt(2)
-
-def main():
+    idx = (bits[:, 0] << 1) | bits[:, 1]   # 2-bit symbol index b0b1
+    return QPSK_LUT[idx]
+
+def shape_pulses(s: np.ndarray, h: np.ndarray, sps: int):
+    """
+    Upsample the real symbol-rate stream s by sps and FIR-filter with h,
+    keeping the first len(s)*sps samples (== lfilter(h, [1.0], zero-stuffed s)).
+    Short filters use the polyphase upfirdn; once each polyphase branch has
+    more than ~16 taps (span_syms > 16), FFT-based oaconvolve on the
+    zero-stuffed stream is faster.
+    """
+    n_out = len(s) * sps
+    if -(-len(h) // sps) <= 16:
+        return upfirdn(h, s, up=sps)[:n_out]
+    up = np.zeros(n_out, dtype=s.dtype)
+    up[::sps] = s
+    return oaconvolve(up, h, mode="full")[:n_out]
+
+def pack_iq(xi: np.ndarray, xq: np.ndarray, amp: float, block: int = 1 << 16,
+            out=None, stage=None):
+    """
+    float32 I, Q -> interleaved int8 I,Q of clip(amp * x / max|x| * 127).
+    Pass 1 interleaves I/Q into a float32 staging buffer block by block and
+    takes each block's peak |x| while it is still in cache (no separate
+    full-length max(abs(x)) scan); pass 2 scales/clips it in place and the
+    int8 store is a single contiguous cast (into `out` if given, e.g. a memmap).
+    `stage` is an optional float32 buffer of at least 2*len(xi) to reuse.
+    """
+    n = len(xi)
+    if stage is None or len(stage) < 2 * n:
+        stage = np.empty(2 * n, dtype=np.float32)
+    tmp = stage[:2 * n]
+    t2 = tmp.reshape(-1, 2)
+    peak = np.float32(0)
+    for lo in range(0, n, block):
+        bi, bq = xi[lo:lo + block], xq[lo:lo + block]
+        t2[lo:lo + block, 0] = bi
+        t2[lo:lo + block, 1] = bq
+        peak = max(peak, np.hypot(bi, bq).max())
+
+    tmp *= np.float32(amp)
+    tmp /= peak + np.float32(1e-12)
+    tmp *= np.float32(127)
+    np.clip(tmp, -128, 127, out=tmp)
+    if out is None:
+        return tmp.astype(np.int8)
+    np.copyto(out, tmp, casting="unsafe")   # same truncation as astype
+    return out
+
+def main(buffers=None):
+    """
+    `buffers` is an optional dict of scratch arrays kept across repeated calls
+    (e.g. a testbed loop); the float32 staging buffer is reused from
+    buffers["stage"] when large enough and stored back there otherwise.
+    """
+    if buffers is None:
+        buffers = {}
     # --- sample rate agreeing with RTL-SDR
     fs = 2_000_000          # 2.0 Msps
     sym_rate = 250_000      # 250 ksps QPSK symbols
@@ -65,6 +116,9 @@ def main():
     guard_syms = 200        # zeros before/after burst (in symbols)
 
     # fixed bits for correlation/sync later
+    # NOTE: analysis/qpsk_lib.generate_reference replays this exact
+    # rng.integers sequence (seed 1234) to rebuild the reference for existing
+    # captures, so the bit source must not change (e.g. to rng.bytes/unpackbits).
     rng = np.random.default_rng(1234)
     pre_bits = rng.integers(0, 2, size=256, dtype=np.int8)   # 128 QPSK symbols
     pre_syms = bits_to_qpsk(pre_bits)
@@ -77,29 +131,26 @@ def main():
     guards = np.zeros(guard_syms, dtype=np.complex64)
     sym_stream = np.concatenate([guards, pre_syms, payload_syms, guards]).astype(np.complex64)
 
-    # Upsample 
-    up = np.zeros(len(sym_stream) * sps, dtype=np.complex64)
-    up[::sps] = sym_stream
-
-    # Pulse shape with RRC
+    # Upsample + pulse shape with RRC.
+    # The taps are real, so I and Q are filtered as separate float32 streams.
     h = rrc_taps(beta=beta, sps=sps, span=span).astype(np.float32)
-    x = lfilter(h, [1.0], up)
+    xi = shape_pulses(np.ascontiguousarray(sym_stream.real), h, sps)
+    xq = shape_pulses(np.ascontiguousarray(sym_stream.imag), h, sps)
 
     # Scale amplitude to avoid clipping 
     # (HackRF uses interleaved int8 IQ)
     amp = 0.25
-    x = amp * x / (np.max(np.abs(x)) + 1e-12)
-
-    i = np.clip(np.real(x) * 127, -128, 127).astype(np.int8)
-    q = np.clip(np.imag(x) * 127, -128, 127).astype(np.int8)
-
-    iq = np.empty(2 * len(i), dtype=np.int8)
-    iq[0::2] = i
-    iq[1::2] = q
-
     out = Path("waveforms") / f"qpsk_fs{fs}_sym{sym_rate}_rrc{beta}_i8iq.bin"
     out.parent.mkdir(parents=True, exist_ok=True)
-    iq.tofile(out)
+    # pack straight into the file-backed output (no in-RAM int8 copy + tofile)
+    n2 = 2 * len(xi)
+    stage = buffers.get("stage")
+    if stage is None or len(stage) < n2:
+        stage = buffers["stage"] = np.empty(n2, dtype=np.float32)
+    iq = np.memmap(out, dtype=np.int8, mode="w+", shape=(n2,))
+    pack_iq(xi, xq, amp, out=iq, stage=stage)
+    iq.flush()
+    del iq
     print("Wrote:", out, "bytes:", out.stat().st_size)
 
     # metadata text file 
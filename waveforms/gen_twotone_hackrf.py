@@ -1,3 +1,4 @@
+import math
 import numpy as np
 from pathlib import Path
 
@@ -12,19 +13,61 @@ f_off2 = +250_000     # +250 kHz
 # Keep amplitude low to avoid clipping
 amp = 0.30
 
-t = np.arange(int(fs * duration_s)) / fs
-x = (np.exp(1j*2*np.pi*f_off1*t) + np.exp(1j*2*np.pi*f_off2*t)) / 2.0
-x = amp * x
+n_samples = int(fs * duration_s)
 
-i = np.clip(np.real(x) * 127, -128, 127).astype(np.int8)
-q = np.clip(np.imag(x) * 127, -128, 127).astype(np.int8)
+def tone(f_hz, n_samples=n_samples, block=4096):
+    """
+    complex64 exp(j2π f_hz n/fs) for n < n_samples without per-sample trig:
+    a block-length rotator table times exact per-block start phasors
+    (phase wrapped in float64, so there is no drift across blocks).
+    """
+    n_blk = -(-n_samples // block)
+    lut = np.exp(1j * 2*np.pi * (f_hz / fs) * np.arange(block)).astype(np.complex64)
+    cyc0 = np.mod(np.arange(n_blk) * (f_hz * block / fs), 1.0)
+    starts = np.exp(1j * 2*np.pi * cyc0).astype(np.complex64)
+    return (starts[:, None] * lut[None, :]).reshape(-1)[:n_samples]
 
-iq = np.empty(2 * len(i), dtype=np.int8)
-iq[0::2] = i
-iq[1::2] = q
+# (exp(j2πf1t) + exp(j2πf2t))/2 == exp(j2πfc t) * cos(2πΔf t),
+# fc = (f1+f2)/2, Δf = (f2-f1)/2. For symmetric offsets fc = 0 and x is real.
+# The waveform itself is float32/complex64.
+f_c = (f_off1 + f_off2) / 2.0
+f_d = (f_off2 - f_off1) / 2.0
+
+# fs and the offsets are fixed above, so the waveform repeats every
+# fs/gcd(fs, fc, Δf) samples (8 for ±250 kHz at 2 Msps): synthesize and
+# quantize one whole number of periods and tile it into the output.
+# A non-integer fs or offset, or a period longer than the whole waveform,
+# falls back to the full-length synth.
+if all(float(v).is_integer() for v in (fs, f_c, f_d)):
+    period = int(fs) // math.gcd(int(fs), math.gcd(int(f_c), int(f_d)))
+else:
+    period = n_samples
+n_synth = min(n_samples, period * max(1, 4096 // period))
+
+x = np.float32(amp) * tone(f_d, n_synth).real
+if f_c != 0:
+    x = x * tone(f_c, n_synth)
+
+# scale -> clip -> int8 on one contiguous interleaved float32 buffer
+# (I0,Q0,I1,Q1,...), then a single contiguous int8 store
+if np.iscomplexobj(x):
+    tmp = x.view(np.float32) * np.float32(127)   # complex64 is already interleaved
+    np.clip(tmp, -128, 127, out=tmp)
+else:
+    # real signal: Q = 0, so only the I slots are scaled/clipped in place
+    tmp = np.zeros(2 * len(x), dtype=np.float32)
+    np.multiply(x, np.float32(127), out=tmp[0::2])
+    np.clip(tmp[0::2], -128, 127, out=tmp[0::2])
 
 out = Path("waveforms") / f"twotone_fs{fs}_off250k_i8iq.bin"
 out.parent.mkdir(parents=True, exist_ok=True)
-iq.tofile(out)
+# cast straight into the file-backed output (no in-RAM int8 copy + tofile)
+chunk = tmp.astype(np.int8)            # same truncation as before
+iq = np.memmap(out, dtype=np.int8, mode="w+", shape=(2 * n_samples,))
+n_rep = len(iq) // len(chunk)
+iq[:n_rep * len(chunk)].reshape(n_rep, -1)[:] = chunk
+iq[n_rep * len(chunk):] = chunk[:len(iq) - n_rep * len(chunk)]
+iq.flush()
+del iq
 
 print("Wrote:", out, "bytes:", out.stat().st_size)